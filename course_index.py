@@ -0,0 +1,332 @@
+"""
+Course Taxonomy & Inverted Index
+================================
+Maps the free-text course names in master_courses.csv ("COMPUTER SCEINCE &
+ENGINEERING", "ELECTRONICS & COMMUNICATION ENGG", ...) to canonical course
+codes and parent disciplines, then precomputes an inverted index so
+"which colleges offer X in state Y" is a set intersection instead of a
+substring scan over every row.
+
+What this script does:
+- Normalizes raw course strings and maps them to a course code + discipline
+- Builds course code -> sorted Cluster_IDs posting lists (one entry per
+  college cluster, so name variants of one college aren't counted twice)
+- Builds per-state and per-course bitmaps over the sorted Cluster_ID list
+- Stores Cluster_ID -> (name, city, state) so results can be resolved
+- Saves data/course_taxonomy.csv and data/course_index.json
+
+Usage:
+    python course_index.py             # build the taxonomy and index
+"""
+
+import json
+import re
+from collections import defaultdict
+
+import pandas as pd
+from data_loading import load_stage
+from entity_resolution import make_college_id
+import warnings
+warnings.filterwarnings('ignore')
+
+TAXONOMY_PATH = 'data/course_taxonomy.csv'
+INDEX_PATH = 'data/course_index.json'
+
+# ============================================================================
+# COURSE TAXONOMY
+# ============================================================================
+
+# (code, canonical name, discipline, pattern) - checked in order, first match
+# wins, so specialisations come before their general course
+COURSE_TAXONOMY = [
+    ('CSE-AIML', 'Computer Science and Engineering (AI & ML)', 'Computing',
+     r'COMPUTER SCIENCE.*(ARTIFICIAL INTELLIGENCE|\bAI\b|MACHINE LEARNING|\bAIML\b)'),
+    ('CSE-DS', 'Computer Science and Engineering (Data Science)', 'Computing',
+     r'COMPUTER SCIENCE.*DATA SCIENCE'),
+    ('CSE', 'Computer Science and Engineering', 'Computing',
+     r'^COMPUTER (SCIENCE|ENGINEERING|TECHNOLOGY|AND COMMUNICATION)|^CSE\b'),
+    ('IT', 'Information Technology', 'Computing',
+     r'^INFORMATION (TECHNOLOGY|SCIENCE|ENGINEERING)'),
+    ('SE', 'Software Engineering', 'Computing', r'SOFTWARE'),
+    ('BME', 'Biomedical Engineering', 'Biotechnology & Biomedical',
+     r'BIOMEDICAL|MEDICAL ELECTRONICS'),
+    ('EIE', 'Electronics and Instrumentation Engineering', 'Electronics',
+     r'INSTRUMENTATION|ELECTRONICS AND CONTROL'),
+    ('EEE', 'Electrical and Electronics Engineering', 'Electrical',
+     r'ELECTRICAL AND ELECTRONICS|ELECTRONICS AND ELECTRICAL|ELECTRICAL ELECTRONICS'),
+    ('EE', 'Electrical Engineering', 'Electrical', r'^ELECTRICAL|^POWER ENGINEERING'),
+    ('ECE', 'Electronics and Communication Engineering', 'Electronics',
+     r'^ELECTRONICS|TELECOMMUNICATION|^ECE\b'),
+    ('BIOTECH', 'Biotechnology', 'Biotechnology & Biomedical', r'BIOTECHNOLOGY'),
+    ('AUTO', 'Automobile Engineering', 'Mechanical', r'AUTOMOBILE|MECHANICAL ENGINEERING AUTO'),
+    ('MECHATRONICS', 'Mechatronics and Robotics', 'Mechanical',
+     r'MECHATRONICS|ROBOTICS|MECHANICAL AND AUTOMATION'),
+    ('PROD', 'Production and Industrial Engineering', 'Mechanical',
+     r'PRODUCTION|INDUSTRIAL|MECHANICAL ENGINEERING PROD'),
+    ('MECH', 'Mechanical Engineering', 'Mechanical', r'^MECHANICAL'),
+    ('MARINE', 'Marine Engineering', 'Mechanical', r'MARINE'),
+    ('AERO', 'Aeronautical and Aerospace Engineering', 'Aerospace',
+     r'AERONAUTICAL|AERO ?SPACE'),
+    ('CIVIL', 'Civil Engineering', 'Civil', r'CIVIL|CONSTRUCTION'),
+    ('ENV', 'Environmental Engineering', 'Civil', r'ENVIRONMENTAL'),
+    ('PETRO', 'Petroleum and Petrochemical Engineering', 'Chemical', r'PETRO'),
+    ('POLYMER', 'Polymer and Plastics Technology', 'Chemical',
+     r'POLYMER|PLASTIC|RUBBER|SURFACE COATING'),
+    ('CHEM', 'Chemical Engineering', 'Chemical',
+     r'CHEMICAL|OLEOCHEMICAL|DYESTUFF|PHARMACEUTICAL'),
+    ('FOOD', 'Food and Dairy Technology', 'Agricultural & Food', r'FOOD|DAIRY|DIARY'),
+    ('AGRI', 'Agricultural Engineering', 'Agricultural & Food', r'AGRICULTUR'),
+    ('TEXTILE', 'Textile and Fashion Technology', 'Textile',
+     r'TEXTILE|FIBRES|FASHION|APPAREL|FOOTWEAR'),
+    ('META', 'Metallurgical and Materials Engineering', 'Materials & Mining',
+     r'METALLURG|MATERIALS'),
+    ('MINING', 'Mining Engineering', 'Materials & Mining', r'MINING'),
+    ('ARCH', 'Architecture and Planning', 'Architecture & Planning',
+     r'ARCHITECTUR|PLANNING'),
+    ('SAFETY', 'Fire and Safety Engineering', 'Other Engineering', r'FIRE|SAFETY'),
+    ('PRINT', 'Printing and Packaging Technology', 'Other Engineering',
+     r'PRINTING|PACKAGING'),
+    ('MGMT', 'Engineering Management', 'Other Engineering', r'MANAGEMENT'),
+]
+
+OTHER_COURSE = ('OTHER', 'Other', 'Other Engineering')
+
+COMPILED_TAXONOMY = [(code, name, discipline, re.compile(pattern))
+                     for code, name, discipline, pattern in COURSE_TAXONOMY]
+
+
+def normalize_course(course):
+    """
+    Uppercases and fixes common spellings/abbreviations before classification
+    """
+    if pd.isna(course):
+        return ''
+    course = str(course).upper()
+    course = course.replace('&', ' AND ')
+    course = re.sub(r'\bENGG\b\.?', 'ENGINEERING', course)
+    course = course.replace('SCEINCE', 'SCIENCE')
+    course = re.sub(r'TELE-?\s*COMMUNICATIONS?', 'TELECOMMUNICATION', course)
+    course = re.sub(r'[^A-Z0-9 ]', ' ', course)
+    return re.sub(r'\s+', ' ', course).strip()
+
+
+def classify_course(course):
+    """
+    Returns (code, canonical name, discipline) for a raw course string
+    """
+    normalized = normalize_course(course)
+    for code, name, discipline, pattern in COMPILED_TAXONOMY:
+        if pattern.search(normalized):
+            return code, name, discipline
+    return OTHER_COURSE
+
+
+# ============================================================================
+# INVERTED INDEX
+# ============================================================================
+
+def bitmap_from_positions(positions):
+    """
+    Packs college positions into a Python int bitmap
+    """
+    bitmap = 0
+    for pos in positions:
+        bitmap |= 1 << pos
+    return bitmap
+
+
+def positions_from_bitmap(bitmap):
+    """
+    Unpacks a bitmap into sorted college positions
+    """
+    positions = []
+    while bitmap:
+        low_bit = bitmap & -bitmap
+        positions.append(low_bit.bit_length() - 1)
+        bitmap ^= low_bit
+    return positions
+
+
+def build_course_index(courses_df):
+    """
+    Builds the taxonomy table and the inverted index from master courses.
+    Colleges are keyed by Cluster_ID, which data_storage.py also uses as
+    college_key. Older master files fall back to College_ID, or to the same
+    per-row ID data_merging.py assigns (make_college_id of name/city/state).
+    """
+    courses_df = courses_df.copy()
+    if 'College_ID' not in courses_df.columns:
+        courses_df['College_ID'] = [
+            make_college_id(name, city, state)
+            for name, city, state in zip(courses_df['College_Name'],
+                                         courses_df['City'], courses_df['State'])
+        ]
+    if 'Cluster_ID' not in courses_df.columns:
+        courses_df['Cluster_ID'] = courses_df['College_ID']
+
+    # 1. Taxonomy - classify each distinct raw string once
+    raw_courses = courses_df['Course'].dropna().unique()
+    taxonomy = {course: classify_course(course) for course in raw_courses}
+    taxonomy_df = pd.DataFrame(
+        [(course, *taxonomy[course]) for course in sorted(raw_courses)],
+        columns=['Course', 'Course_Code', 'Canonical_Course', 'Discipline']
+    )
+
+    # 2. College positions over the sorted ID list
+    college_ids = sorted(courses_df['Cluster_ID'].unique())
+    position = {college_id: pos for pos, college_id in enumerate(college_ids)}
+
+    # 3. Posting lists and bitmaps
+    course_postings = defaultdict(set)
+    state_positions = defaultdict(set)
+    for college_id, state, course in zip(courses_df['Cluster_ID'],
+                                         courses_df['State'], courses_df['Course']):
+        pos = position[college_id]
+        if pd.notna(state):
+            state_positions[str(state)].add(pos)
+        if course in taxonomy:
+            course_postings[taxonomy[course][0]].add(pos)
+
+    disciplines = defaultdict(set)
+    for code, name, discipline in set(taxonomy.values()):
+        disciplines[discipline].add(code)
+
+    college_info = {}
+    for college_id, name, city, state in zip(courses_df['Cluster_ID'], courses_df['College_Name'],
+                                             courses_df['City'], courses_df['State']):
+        # Missing values become '' so the saved index stays valid JSON
+        college_info.setdefault(college_id, ['' if pd.isna(value) else value
+                                             for value in (name, city, state)])
+
+    index = {
+        'colleges': college_ids,
+        'college_info': {college_id: college_info[college_id] for college_id in college_ids},
+        'courses': {
+            code: {
+                'college_ids': [college_ids[pos] for pos in sorted(positions)],
+                'bitmap': bitmap_from_positions(positions),
+            }
+            for code, positions in course_postings.items()
+        },
+        'states': {state: bitmap_from_positions(positions)
+                   for state, positions in state_positions.items()},
+        'disciplines': {discipline: sorted(codes)
+                        for discipline, codes in disciplines.items()},
+    }
+    return taxonomy_df, index
+
+
+def save_course_index(index, path=INDEX_PATH):
+    """
+    Saves the index as JSON (bitmaps stored as hex strings)
+    """
+    serializable = {
+        'colleges': index['colleges'],
+        'college_info': index['college_info'],
+        'courses': {code: {'college_ids': entry['college_ids'], 'bitmap': hex(entry['bitmap'])}
+                    for code, entry in index['courses'].items()},
+        'states': {state: hex(bitmap) for state, bitmap in index['states'].items()},
+        'disciplines': index['disciplines'],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(serializable, f)
+
+
+def load_course_index(path=INDEX_PATH):
+    """
+    Loads an index saved by save_course_index
+    """
+    with open(path, encoding='utf-8') as f:
+        index = json.load(f)
+    for entry in index['courses'].values():
+        entry['bitmap'] = int(entry['bitmap'], 16)
+    index['states'] = {state: int(bitmap, 16) for state, bitmap in index['states'].items()}
+    return index
+
+
+def colleges_offering(index, course=None, state=None, discipline=None):
+    """
+    Cluster_IDs offering a course (code or raw name) and/or any course in a
+    discipline, optionally limited to one state - all via bitmap intersection.
+    A raw course name that doesn't map to a known course matches nothing.
+    """
+    all_colleges = (1 << len(index['colleges'])) - 1
+    bitmap = all_colleges
+
+    if course is not None:
+        code = course if course in index['courses'] else classify_course(course)[0]
+        if code == OTHER_COURSE[0] and course != code:
+            return []
+        entry = index['courses'].get(code)
+        bitmap &= entry['bitmap'] if entry else 0
+
+    if discipline is not None:
+        discipline_bitmap = 0
+        for code in index['disciplines'].get(discipline, []):
+            if code in index['courses']:
+                discipline_bitmap |= index['courses'][code]['bitmap']
+        bitmap &= discipline_bitmap
+
+    if state is not None:
+        bitmap &= index['states'].get(state, 0)
+
+    return [index['colleges'][pos] for pos in positions_from_bitmap(bitmap)]
+
+
+def describe_colleges(index, college_ids):
+    """
+    Resolves Cluster_IDs from colleges_offering to name/city/state records
+    """
+    return [
+        dict(zip(['Cluster_ID', 'College_Name', 'City', 'State'],
+                 [college_id] + list(index['college_info'][college_id])))
+        for college_id in college_ids
+    ]
+
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+def main():
+    """
+    Builds and saves the course taxonomy and inverted index
+    """
+    print("\n" + "="*80)
+    print("BUILDING COURSE TAXONOMY & INDEX")
+    print("="*80)
+
+    try:
+        courses_df = load_stage('course_index')
+        print(f"✓ Loaded {len(courses_df):,} course entries")
+
+        taxonomy_df, index = build_course_index(courses_df)
+        unmapped = (taxonomy_df['Course_Code'] == OTHER_COURSE[0]).sum()
+        print(f"\n✓ Mapped {len(taxonomy_df)} raw course names to "
+              f"{taxonomy_df['Course_Code'].nunique()} course codes "
+              f"in {taxonomy_df['Discipline'].nunique()} disciplines")
+        if unmapped:
+            print(f"   ⚠ {unmapped} raw course names fell back to {OTHER_COURSE[0]}")
+
+        taxonomy_df.to_csv(TAXONOMY_PATH, index=False)
+        save_course_index(index)
+        print(f"\n✓ SAVED: {TAXONOMY_PATH}")
+        print(f"✓ SAVED: {INDEX_PATH} ({len(index['colleges'])} colleges, "
+              f"{len(index['states'])} states)")
+
+        print(f"\n📊 Top 5 course codes by colleges offering:")
+        top_codes = sorted(index['courses'].items(),
+                           key=lambda item: len(item[1]['college_ids']), reverse=True)[:5]
+        for code, entry in top_codes:
+            print(f"   {code:<14} {len(entry['college_ids']):4d} colleges")
+
+        print("\n✅ Course index complete!")
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ What this script does:
 import pandas as pd
 import numpy as np
 import re
+from data_loading import load_stage
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -140,8 +141,8 @@ def clean_engineering_colleges_india():
     print("CLEANING: engineering colleges in India.csv")
     print("="*80)
     
-    # Read the CSV
-    df = pd.read_csv('data/engineering colleges in India.csv')
+    # Read the CSV (declared columns only, text columns as strings)
+    df = load_stage('clean_engineering_colleges_india')
     print(f"✓ Loaded {len(df)} rows")
     
     # 1. Standardize College Names
@@ -210,10 +211,10 @@ def clean_engineering_csv():
     
     # Read the CSV with different encoding to handle special characters
     try:
-        df = pd.read_csv('data/Engineering.csv', encoding='utf-8')
+        df = load_stage('clean_engineering_csv', encoding='utf-8')
     except UnicodeDecodeError:
         print("   ⚠ UTF-8 encoding failed, trying Latin-1...")
-        df = pd.read_csv('data/Engineering.csv', encoding='latin-1')
+        df = load_stage('clean_engineering_csv', encoding='latin-1')
     
     print(f"✓ Loaded {len(df)} rows")
     
@@ -275,8 +276,8 @@ def clean_nirf_rankings():
     print("CLEANING: NIRF Ranking for Engineering Colleges 2024.csv")
     print("="*80)
     
-    # Read the CSV
-    df = pd.read_csv('data/NIRF Ranking for Engineering Colleges 2024.csv')
+    # Read the CSV (every column the cleaned file keeps)
+    df = load_stage('clean_nirf_rankings')
     print(f"✓ Loaded {len(df)} rows")
     
     # 1. Standardize College Names
@@ -0,0 +1,287 @@
+"""
+Column-Projected Data Loading
+=============================
+Declares which columns each pipeline stage needs and loads only those,
+instead of reading every column (Facilities, Address and other long text)
+for every stage.
+
+What this module does:
+- STAGES maps each stage to its CSV path and required columns + dtypes
+- Uses the pyarrow CSV reader when pyarrow is installed (multi-line quoted
+  fields like Engineering.csv's Address are supported), otherwise pandas
+  read_csv with usecols and explicit dtypes
+- Undecodable bytes raise UnicodeDecodeError on both readers (the file is
+  decoded up front before a pyarrow read), so callers can retry with another
+  encoding without masking schema errors
+
+Usage:
+    python data_loading.py             # compare full vs projected loads
+"""
+
+import codecs
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# dtype name -> (pandas dtype, pyarrow type); None lets the reader infer it
+DTYPES = {
+    'str': ('object', 'string'),
+    'float': ('float64', 'float64'),
+    'int': ('int64', 'int64'),
+}
+
+# ============================================================================
+# STAGE COLUMN DECLARATIONS
+# ============================================================================
+
+# Cleaning writes full cleaned files, so cleaning stages keep every output
+# column but still get explicit text dtypes. Merge/verify stages only read
+# what they use.
+STAGES = {
+    'clean_engineering_colleges_india': {
+        'path': 'data/engineering colleges in India.csv',
+        'columns': {
+            'College Name': 'str', 'Genders Accepted': 'str', 'Campus Size': None,
+            'Total Student Enrollments': None, 'Total Faculty': None,
+            'Established Year': None, 'Rating': None, 'University': 'str',
+            'Courses': 'str', 'Facilities': 'str', 'City': 'str', 'State': 'str',
+            'Country': 'str', 'College Type': 'str', 'Average Fees': 'str',
+        },
+    },
+    'clean_engineering_csv': {
+        'path': 'data/Engineering.csv',
+        'columns': {
+            'College ID': None, 'college name': 'str', 'Institute Region': 'str',
+            'State': 'str', 'District': 'str', 'Address': 'str',
+            'Year of Establishment': 'str', 'Institute Type': 'str',
+            'College Category': 'str', 'Website': 'str', 'University': 'str',
+            'NBA': 'str', 'NAAC': 'str', 'NIRF': 'str', 'Women Institute': 'str',
+            'Course': 'str',
+        },
+    },
+    'clean_nirf_rankings': {
+        'path': 'data/NIRF Ranking for Engineering Colleges 2024.csv',
+        'columns': {
+            'Sl\nNo': None, 'Name': 'str', 'City': 'str', 'State': 'str', 'Rank': 'str',
+        },
+    },
+    # Campus Size, Enrollments, Faculty, Year and Rating are only NaN-filled
+    # by cleaning, not converted, so they may still hold text
+    'merge_base': {
+        'path': 'data/cleaned_engineering_colleges_india.csv',
+        'columns': {
+            'College Name': 'str', 'Genders Accepted': 'str', 'Campus Size': None,
+            'Total Student Enrollments': None, 'Total Faculty': None,
+            'Established Year': None, 'Rating': None, 'University': 'str',
+            'Courses': 'str', 'Facilities': 'str', 'City': 'str', 'State': 'str',
+            'Country': 'str', 'College Type': 'str', 'Average Fees': 'float',
+        },
+    },
+    'merge_dataset2': {
+        'path': 'data/cleaned_engineering.csv',
+        'columns': {
+            'college name': 'str', 'Institute Region': 'str', 'State': 'str',
+            'District': 'str', 'Address': 'str', 'Institute Type': 'str',
+            'College Category': 'str', 'Website': 'str', 'NBA': 'str', 'NAAC': 'str',
+            'NIRF': 'str', 'Women Institute': 'str', 'Course': 'str',
+        },
+    },
+    'merge_nirf': {
+        'path': 'data/cleaned_nirf_rankings.csv',
+        'columns': {'Name': 'str', 'City': 'str', 'State': 'str', 'Rank': 'int'},
+    },
+    'verify_colleges': {
+        'path': 'data/master_colleges.csv',
+        'columns': {
+            'College Name': 'str', 'City': 'str', 'State': 'str', 'NIRF_Rank': 'float',
+            'NBA_Accreditation': 'str', 'NAAC_Accreditation': 'str',
+        },
+    },
+    'verify_courses': {
+        'path': 'data/master_courses.csv',
+        'columns': {
+            'College_ID': 'str', 'Cluster_ID': 'str', 'College_Name': 'str', 'Course': 'str',
+        },
+        'optional': {'College_ID', 'Cluster_ID'},
+    },
+    'storage_colleges': {
+        'path': 'data/master_colleges.csv',
+        'columns': {
+            'College_ID': 'str', 'Cluster_ID': 'str', 'College Name': 'str',
+            'City': 'str', 'State': 'str', 'University': 'str', 'College Type': 'str', 'Institute_Type': 'str',
+            'Established Year': 'float', 'Rating': 'float', 'Average Fees': 'float',
+            'NIRF_Rank': 'float', 'NBA_Accreditation': 'str',
+            'NAAC_Accreditation': 'str', 'Website': 'str', 'Data_Sources': 'str',
+        },
+        'optional': {'College_ID', 'Cluster_ID'},
+    },
+    'storage_courses': {
+        'path': 'data/master_courses.csv',
+        'columns': {
+            'College_ID': 'str', 'Cluster_ID': 'str', 'College_Name': 'str',
+            'Course': 'str', 'City': 'str', 'State': 'str',
+        },
+        'optional': {'College_ID', 'Cluster_ID'},
+    },
+    'course_index': {
+        'path': 'data/master_courses.csv',
+        'columns': {
+            'College_ID': 'str', 'Cluster_ID': 'str', 'College_Name': 'str',
+            'Course': 'str', 'City': 'str', 'State': 'str',
+        },
+        'optional': {'College_ID', 'Cluster_ID'},
+    },
+}
+
+
+# ============================================================================
+# LOADERS
+# ============================================================================
+
+def read_header(path, encoding='utf-8'):
+    """
+    Returns the column names of a CSV without reading any rows
+    """
+    return list(pd.read_csv(path, nrows=0, encoding=encoding).columns)
+
+
+def check_encoding(path, encoding, chunk_size=1 << 20):
+    """
+    Decodes the whole file in chunks, raising UnicodeDecodeError on the
+    first undecodable byte (pyarrow only reports these as ArrowInvalid)
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            decoder.decode(chunk)
+    decoder.decode(b'', final=True)
+
+
+def read_columns(path, columns, encoding='utf-8', optional=()):
+    """
+    Reads only the given columns ({name: dtype name or None}) from a CSV.
+    Optional columns are skipped when the file doesn't have them.
+    """
+    if optional:
+        header = set(read_header(path, encoding))
+        columns = {col: dtype for col, dtype in columns.items()
+                   if col not in optional or col in header}
+
+    if HAS_PYARROW:
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=list(columns),
+            column_types={col: getattr(pa, DTYPES[dtype][1])()
+                          for col, dtype in columns.items() if dtype},
+            strings_can_be_null=True,
+        )
+        check_encoding(path, encoding)
+        table = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(encoding=encoding),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=convert_options,
+        )
+        df = table.to_pandas()
+    else:
+        df = pd.read_csv(
+            path,
+            usecols=list(columns),
+            dtype={col: DTYPES[dtype][0] for col, dtype in columns.items() if dtype},
+            encoding=encoding,
+        )
+
+    return df[list(columns)]
+
+
+def load_stage(stage, encoding='utf-8'):
+    """
+    Loads the declared columns for a pipeline stage
+    """
+    spec = STAGES[stage]
+    return read_columns(spec['path'], spec['columns'], encoding=encoding,
+                        optional=spec.get('optional', ()))
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def measure_load(stage, encoding, projected, trace):
+    """
+    Loads a stage once and returns (ms, peak MB or None, column count).
+    Meant to run in a fresh process so peak memory covers only this load:
+    tracemalloc counts Python/numpy allocations, and Arrow's own buffer
+    pool peak is added when pyarrow is in use.
+    """
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if projected:
+        df = load_stage(stage, encoding=encoding)
+    else:
+        df = pd.read_csv(STAGES[stage]['path'], encoding=encoding)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    peak_mb = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if HAS_PYARROW:
+            peak += pa.default_memory_pool().max_memory() or 0
+        peak_mb = peak / 1e6
+    return elapsed_ms, peak_mb, len(df.columns)
+
+
+def run_isolated(*args):
+    """
+    Runs measure_load in its own process
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(measure_load, *args).result()
+
+
+def benchmark_stage(stage, encoding='utf-8'):
+    """
+    Compares a full pd.read_csv against the projected stage load.
+    Time and peak memory are measured in separate runs (tracemalloc slows
+    loading down), each in a fresh process.
+    """
+    full_ms, _, full_cols = run_isolated(stage, encoding, False, False)
+    _, full_mb, _ = run_isolated(stage, encoding, False, True)
+    projected_ms, _, projected_cols = run_isolated(stage, encoding, True, False)
+    _, projected_mb, _ = run_isolated(stage, encoding, True, True)
+
+    print(f"   {stage:<24} full {full_ms:8.1f} ms {full_mb:7.2f} MB peak | "
+          f"projected {projected_ms:8.1f} ms {projected_mb:7.2f} MB peak "
+          f"({projected_cols}/{full_cols} columns)")
+
+
+def main():
+    print("\n" + "="*80)
+    print("LOADER BENCHMARK")
+    print("="*80)
+    print(f"\nReader: {'pyarrow' if HAS_PYARROW else 'pandas (pyarrow not installed)'}\n")
+
+    for stage, spec in STAGES.items():
+        if os.path.exists(spec['path']):
+            try:
+                benchmark_stage(stage)
+            except UnicodeDecodeError:
+                benchmark_stage(stage, encoding='latin-1')
+        else:
+            print(f"   {stage:<24} skipped (missing {spec['path']})")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,42 @@ Fixes the fuzzy matching issues by:
 1. Using stricter matching threshold (95%+)
 2. Checking city/state for confirmation
 3. Adding unmatched NIRF colleges to master database
+4. Keying every merge on a stable College_ID per (name, city, state), grouped
+   into clusters of name variants (Cluster_ID), so multi-campus names are never
+   updated together
+
+Every match decision is persisted to data/match_decisions.csv and reused on
+the next run. Manual force-match / force-reject entries in
+data/match_overrides.csv are applied before any fuzzy scoring.
 """
 
+import hashlib
+import os
 import pandas as pd
 import numpy as np
 from fuzzywuzzy import fuzz, process
+from entity_resolution import resolve_college_ids
+from data_loading import load_stage
 import warnings
 warnings.filterwarnings('ignore')
 
+MATCH_DECISIONS_PATH = 'data/match_decisions.csv'
+MATCH_OVERRIDES_PATH = 'data/match_overrides.csv'
+
+# Bump whenever find_best_match_improved / find_dataset2_match change, so
+# decisions saved by older matching logic are rescored instead of reused
+MATCHER_VERSION = 2
+
 print("\n" + "="*80)
 print("FIXED DATA MERGING PROCESS")
 print("="*80)
 print("\nThis will create corrected master databases with proper NIRF matching.\n")
 
-# Load all datasets
-df1 = pd.read_csv('data/cleaned_engineering_colleges_india.csv')
-df2 = pd.read_csv('data/cleaned_engineering.csv')
-df3 = pd.read_csv('data/cleaned_nirf_rankings.csv')
+# Each dataset is read (only the columns its stage declares) right before
+# the merge stage that uses it
+df1 = load_stage('merge_base')
 
-print(f"✓ Datasets loaded")
+print(f"✓ Dataset 1 loaded ({len(df1)} colleges)")
 
 # Start with Dataset 1 as base
 master_df = df1.copy()
@@ -45,6 +62,34 @@ master_df['Data_Sources'] = 'Dataset1'
 
 print("✓ Schema created")
 
+# Resolve duplicate campuses into one stable ID per (name, city, state) cluster
+college_ids, college_aliases = resolve_college_ids(master_df)
+master_df.insert(0, 'College_ID', college_ids)
+master_df.insert(1, 'Cluster_ID', master_df['College_ID'].map(college_aliases))
+print(f"✓ Resolved {len(master_df)} rows into {master_df['College_ID'].nunique()} college IDs "
+      f"({len(set(college_aliases.values()))} clusters)")
+
+
+def build_row_index(master_df):
+    """
+    Precomputes name -> row ids and cluster -> row ids lookups
+    (replaces whole-frame string-equality scans). Clusters are keyed by
+    Cluster_ID, the representative College_ID from the alias map.
+    """
+    name_rows = master_df.groupby('College Name').groups
+    id_rows = master_df.groupby('Cluster_ID').groups
+    return name_rows, id_rows
+
+
+def campus_rows(row_id):
+    """
+    Row ids of the college cluster that master row row_id belongs to
+    """
+    return id_rows[master_df.at[row_id, 'Cluster_ID']]
+
+
+name_rows, id_rows = build_row_index(master_df)
+
 #=============================================================================
 # IMPROVED FUZZY MATCHING FUNCTION
 #=============================================================================
@@ -52,38 +97,189 @@ print("✓ Schema created")
 def find_best_match_improved(nirf_name, nirf_city, nirf_state, master_df, threshold=95):
     """
     Improved matching that considers name + location
+    Returns (master row id, matched name, score, match type)
+    """
+    # Try exact match first, otherwise find best name match
+    if nirf_name in name_rows:
+        matched_name, score, match_type = nirf_name, 100, "exact"
+    else:
+        result = process.extractOne(nirf_name, master_df['College Name'].tolist(),
+                                    scorer=fuzz.token_sort_ratio)
+        if not result or result[1] < threshold:
+            return None, None, 0, "not_found"
+        matched_name, score, match_type = result[0], result[1], None
+    
+    # Verify with location - pick the campus that matches on city or state
+    matched_colleges = master_df.loc[name_rows[matched_name]]
+    for idx, row in matched_colleges.iterrows():
+        if (pd.notna(nirf_city) and pd.notna(row['City']) and 
+            str(nirf_city).lower() in str(row['City']).lower()):
+            return idx, matched_name, score, match_type or "name+city"
+    for idx, row in matched_colleges.iterrows():
+        if (pd.notna(nirf_state) and pd.notna(row['State']) and 
+            str(nirf_state).lower() == str(row['State']).lower()):
+            return idx, matched_name, score, match_type or "name+state"
+    
+    # If no location match, return anyway but flag it
+    return matched_colleges.index[0], matched_name, score, match_type or "name_only"
+
+#=============================================================================
+# MATCH DECISION LOG (WARM START + MANUAL OVERRIDES)
+#=============================================================================
+
+def load_match_overrides(path=MATCH_OVERRIDES_PATH):
+    """
+    Loads manual overrides keyed by (Source, Source_Name)
+    Action is 'force_match' or 'force_reject'. A force_match target is named
+    by College_ID, or by Matched_Name narrowed with Matched_City/Matched_State
+    """
+    if not os.path.exists(path):
+        return {}
+    overrides_df = pd.read_csv(path, dtype=str).fillna('')
+    return {
+        (row['Source'], row['Source_Name']): row
+        for row in overrides_df.to_dict('records')
+    }
+
+
+def load_match_decisions(path=MATCH_DECISIONS_PATH):
+    """
+    Loads decisions from the previous run keyed by (Source, Source_Name)
+    """
+    if not os.path.exists(path):
+        return {}
+    # Key and fingerprint columns are compared as strings, so keep them as read
+    text_columns = ['Source', 'Source_Name', 'Source_City', 'Source_State', 'Master_Fingerprint']
+    decisions_df = pd.read_csv(path, dtype={col: str for col in text_columns})
+    for col in text_columns:
+        if col in decisions_df.columns:
+            decisions_df[col] = decisions_df[col].fillna('')
+    return {
+        (row['Source'], row['Source_Name']): row
+        for row in decisions_df.to_dict('records')
+    }
+
+
+def fingerprint_master(master_df):
+    """
+    Hash of the master key columns (row order, name, city, state).
+    Any edit to these invalidates decisions cached against the old table.
+    """
+    key_hashes = pd.util.hash_pandas_object(master_df[['College Name', 'City', 'State']], index=True)
+    return hashlib.sha1(key_hashes.values.tobytes()).hexdigest()[:16]
+
+
+def resolve_override_target(override, master_df):
+    """
+    Returns the master row id a force_match override points at, or None if
+    nothing matches. Raises ValueError when the target fits several campuses.
     """
-    # Try exact match first
-    exact = master_df[master_df['College Name'] == nirf_name]
-    if len(exact) > 0:
-        return exact.iloc[0]['College Name'], 100, "exact"
+    college_id = override.get('College_ID', '')
+    if college_id:
+        candidates = master_df.index[master_df['College_ID'] == college_id]
+        label = college_id
+    else:
+        candidates = name_rows.get(override['Matched_Name'], [])
+        for field, col in [('Matched_City', 'City'), ('Matched_State', 'State')]:
+            value = override.get(field, '')
+            if value:
+                candidates = [idx for idx in candidates
+                              if str(master_df.at[idx, col]).lower() == value.lower()]
+        label = override['Matched_Name']
     
-    # Get all college names
-    master_names = master_df['College Name'].tolist()
+    if len(candidates) > 1:
+        raise ValueError(
+            f"Override target '{label}' for {override['Source']} '{override['Source_Name']}' "
+            f"matches {len(candidates)} campuses; add College_ID or Matched_City/Matched_State "
+            f"to {MATCH_OVERRIDES_PATH}"
+        )
+    return candidates[0] if len(candidates) else None
+
+
+def source_location(value):
+    """
+    Normalizes a source city/state for the decision key (NaN -> '')
+    """
+    return '' if pd.isna(value) else str(value)
+
+
+match_overrides = load_match_overrides()
+previous_decisions = load_match_decisions()
+match_decisions = {}
+decision_stats = {}
+
+
+def print_decision_stats(source):
+    stats = decision_stats.get(source, {'override': 0, 'cached': 0, 'scored': 0})
+    print(f"   - Decisions: {stats['override']} overrides, "
+          f"{stats['cached']} reused, {stats['scored']} newly scored")
+
+
+def decide_match(source, source_name, source_city, source_state, threshold,
+                 master_df, master_fingerprint, scorer):
+    """
+    Returns (master row id, matched name, score, match type) for one source name.
+    Order: manual override -> cached decision from last run -> fuzzy scoring.
+    Every decision is recorded in match_decisions for saving.
+    """
+    source_city, source_state = source_location(source_city), source_location(source_state)
+    key = (source, source_name)
+    stats = decision_stats.setdefault(source, {'override': 0, 'cached': 0, 'scored': 0})
+    decision = None
     
-    # Find best name match
-    result = process.extractOne(nirf_name, master_names, scorer=fuzz.token_sort_ratio)
+    override = match_overrides.get(key)
+    if override is not None:
+        if override['Action'] == 'force_reject':
+            decision = (None, None, 0, "override_reject")
+        elif override['Action'] == 'force_match':
+            forced = resolve_override_target(override, master_df)
+            if forced is not None:
+                decision = (forced, master_df.at[forced, 'College Name'], 100, "override_match")
+            else:
+                print(f"   ⚠ Override target not found: "
+                      f"{override.get('College_ID') or override['Matched_Name']}")
+        if decision is not None:
+            stats['override'] += 1
     
-    if result and result[1] >= threshold:
-        matched_name = result[0]
-        score = result[1]
-        
-        # Verify with location
-        matched_colleges = master_df[master_df['College Name'] == matched_name]
-        
-        # Check if any match on city or state
-        for idx, row in matched_colleges.iterrows():
-            if (pd.notna(nirf_city) and pd.notna(row['City']) and 
-                str(nirf_city).lower() in str(row['City']).lower()):
-                return matched_name, score, "name+city"
-            if (pd.notna(nirf_state) and pd.notna(row['State']) and 
-                str(nirf_state).lower() == str(row['State']).lower()):
-                return matched_name, score, "name+state"
-        
-        # If no location match, return anyway but flag it
-        return matched_name, score, "name_only"
+    if decision is None:
+        cached = previous_decisions.get(key)
+        # Reuse only if made by the same matcher for the same source location
+        # against the same master keys with the same threshold (files from
+        # older versions never match)
+        if (cached is not None and cached['Threshold'] == threshold
+                and cached.get('Source_City') == source_city
+                and cached.get('Source_State') == source_state
+                and cached.get('Master_Fingerprint') == master_fingerprint
+                and cached.get('Matcher_Version') == MATCHER_VERSION
+                and not str(cached['Match_Type']).startswith('override')):
+            if pd.isna(cached['Master_Row_Id']):
+                decision = (None, None, 0, cached['Match_Type'])
+            else:
+                row_id = int(cached['Master_Row_Id'])
+                if master_df.at[row_id, 'College Name'] == cached['Matched_Name']:
+                    decision = (row_id, cached['Matched_Name'], cached['Score'], cached['Match_Type'])
+        if decision is not None:
+            stats['cached'] += 1
+    
+    if decision is None:
+        decision = scorer()
+        stats['scored'] += 1
     
-    return None, 0, "not_found"
+    row_id, matched_name, score, match_type = decision
+    match_decisions[key] = {
+        'Source': source,
+        'Source_Name': source_name,
+        'Source_City': source_city,
+        'Source_State': source_state,
+        'Master_Row_Id': row_id,
+        'Matched_Name': matched_name,
+        'Score': score,
+        'Match_Type': match_type,
+        'Threshold': threshold,
+        'Master_Fingerprint': master_fingerprint,
+        'Matcher_Version': MATCHER_VERSION
+    }
+    return decision
 
 #=============================================================================
 # MERGE NIRF RANKINGS WITH IMPROVED MATCHING
@@ -95,6 +291,8 @@ print("="*80)
 
 matched_colleges = []
 unmatched_colleges = []
+df3 = load_stage('merge_nirf')
+master_fingerprint = fingerprint_master(master_df)
 
 for idx, row in df3.iterrows():
     nirf_name = row['Name']
@@ -102,14 +300,16 @@ for idx, row in df3.iterrows():
     nirf_state = row.get('State', '')
     nirf_rank = row['Rank']
     
-    # Try to find match
-    matched_name, score, match_type = find_best_match_improved(
-        nirf_name, nirf_city, nirf_state, master_df, threshold=95
+    # Try to find match (overrides and last run's decisions are checked first)
+    row_id, matched_name, score, match_type = decide_match(
+        'NIRF', nirf_name, nirf_city, nirf_state, 95, master_df, master_fingerprint,
+        lambda: find_best_match_improved(nirf_name, nirf_city, nirf_state, master_df, threshold=95)
     )
     
     if matched_name and score >= 95:
         # Good match found
-        mask = master_df['College Name'] == matched_name
+        # Update only the matched campus (its College_ID cluster)
+        mask = campus_rows(row_id)
         master_df.loc[mask, 'NIRF_Rank'] = nirf_rank
         
         # Update data sources
@@ -120,6 +320,7 @@ for idx, row in df3.iterrows():
         matched_colleges.append({
             'NIRF_Name': nirf_name,
             'Matched_Name': matched_name,
+            'College_ID': master_df.at[row_id, 'College_ID'],
             'Score': score,
             'Type': match_type,
             'Rank': nirf_rank
@@ -136,6 +337,7 @@ for idx, row in df3.iterrows():
 print(f"\n✓ Matching Results:")
 print(f"   - Matched with high confidence: {len(matched_colleges)}")
 print(f"   - Unmatched (will be added): {len(unmatched_colleges)}")
+print_decision_stats('NIRF')
 
 # Show matched colleges
 print(f"\n📊 Sample Matched Colleges (first 5):")
@@ -153,6 +355,7 @@ print("="*80)
 
 print(f"\n🏆 Adding {len(unmatched_colleges)} NIRF-ranked colleges that weren't in Dataset 1:")
 
+new_rows = []
 for college in unmatched_colleges:
     # Create new row with NIRF data
     new_row = {
@@ -186,11 +389,20 @@ for college in unmatched_colleges:
         'Data_Sources': 'Dataset3'
     }
     
-    # Add to master
-    master_df = pd.concat([master_df, pd.DataFrame([new_row])], ignore_index=True)
+    new_rows.append(new_row)
     
     print(f"   Rank {int(college['Rank']):3d}: {college['Name']}")
 
+# Add to master in one go
+if new_rows:
+    master_df = pd.concat([master_df, pd.DataFrame(new_rows)], ignore_index=True)
+
+# Re-resolve on the combined frame so new rows go through the same
+# clustering as Dataset 1 (existing College_IDs don't change)
+master_df['College_ID'], college_aliases = resolve_college_ids(master_df)
+master_df['Cluster_ID'] = master_df['College_ID'].map(college_aliases)
+name_rows, id_rows = build_row_index(master_df)
+
 print(f"\n✓ Master database now has {len(master_df)} colleges")
 
 #=============================================================================
@@ -201,18 +413,42 @@ print(f"\n" + "="*80)
 print("MERGING COURSE-LEVEL DATA (Dataset 2)")
 print("="*80)
 
+df2 = load_stage('merge_dataset2')
 df2_colleges = df2['college name'].unique()
 matches_found_d2 = 0
-master_colleges_list = master_df['College Name'].tolist()
+master_college_names = master_df['College Name'].to_dict()
+master_fingerprint = fingerprint_master(master_df)
+
+
+df2_first_rows = df2.drop_duplicates('college name').set_index('college name')
+
+
+def find_dataset2_match(college_name, state):
+    """
+    Fuzzy name match used for Dataset 2 (threshold 80); among campuses
+    sharing the matched name, the one in the same state is preferred
+    """
+    result = process.extractOne(college_name, master_college_names, scorer=fuzz.token_sort_ratio)
+    if not result or result[1] < 80:
+        return None, None, 0, "not_found"
+    
+    matched_name, score, row_id = result
+    for idx in name_rows[matched_name]:
+        if str(master_df.at[idx, 'State']).lower() == str(state).lower():
+            return idx, matched_name, score, "name+state"
+    return row_id, matched_name, score, "name_only"
+
 
 for college_name in df2_colleges:
-    result = process.extractOne(college_name, master_colleges_list, scorer=fuzz.token_sort_ratio)
+    college_data = df2_first_rows.loc[college_name]
+    row_id, matched_name, score, match_type = decide_match(
+        'Dataset2', college_name, '', college_data.get('State', ''), 80, master_df, master_fingerprint,
+        lambda: find_dataset2_match(college_name, college_data.get('State', ''))
+    )
     
-    if result and result[1] >= 80:
-        matched_name = result[0]
-        college_data = df2[df2['college name'] == college_name].iloc[0]
-        
-        mask = master_df['College Name'] == matched_name
+    if matched_name:
+        # Update only the matched campus (its College_ID cluster)
+        mask = campus_rows(row_id)
         
         # Update fields
         if master_df.loc[mask, 'Institute_Region'].values[0] == 'Not Available':
@@ -252,6 +488,7 @@ for college_name in df2_colleges:
         matches_found_d2 += 1
 
 print(f"\n✓ Matched {matches_found_d2} colleges from Dataset 2")
+print_decision_stats('Dataset2')
 
 #=============================================================================
 # CREATE COURSE-LEVEL DATABASE
@@ -263,17 +500,20 @@ print("="*80)
 
 course_level_data = []
 
-for idx, row in df2.iterrows():
+for idx, row in df2[['college name', 'Course']].iterrows():
     college_name = row['college name']
     course_name = row['Course']
     
-    result = process.extractOne(college_name, master_colleges_list, scorer=fuzz.token_sort_ratio)
+    # Decisions were made once per college name in the Dataset 2 merge above
+    decision = match_decisions.get(('Dataset2', college_name))
     
-    if result and result[1] >= 80:
-        matched_name = result[0]
-        college_info = master_df[master_df['College Name'] == matched_name].iloc[0]
+    if decision and decision['Matched_Name']:
+        matched_name = decision['Matched_Name']
+        college_info = master_df.loc[decision['Master_Row_Id']]
         
         course_entry = {
+            'College_ID': college_info['College_ID'],
+            'Cluster_ID': college_info['Cluster_ID'],
             'College_Name': matched_name,
             'Course': course_name,
             'City': college_info['City'],
@@ -309,6 +549,12 @@ courses_df.to_csv('data/master_courses_fixed.csv', index=False)
 print(f"\n✓ SAVED: data/master_colleges_fixed.csv ({len(master_df)} colleges)")
 print(f"✓ SAVED: data/master_courses_fixed.csv ({len(courses_df)} course entries)")
 
+# Save every match decision for the next run's warm start
+decisions_df = pd.DataFrame(list(match_decisions.values()))
+decisions_df['Master_Row_Id'] = decisions_df['Master_Row_Id'].astype('Int64')
+decisions_df.to_csv(MATCH_DECISIONS_PATH, index=False)
+print(f"✓ SAVED: {MATCH_DECISIONS_PATH} ({len(decisions_df)} match decisions)")
+
 #=============================================================================
 # VERIFICATION
 #=============================================================================
@@ -329,6 +575,8 @@ duplicates = master_df['College Name'].duplicated().sum()
 print(f"\n📊 Duplicate Check:")
 print(f"   - Duplicate college names: {duplicates}")
 print(f"   - This is NORMAL (different branches/cities)")
+print(f"   - Distinct college IDs: {master_df['College_ID'].nunique()}")
+print(f"   - College clusters (name variants merged): {master_df['Cluster_ID'].nunique()}")
 
 print(f"\n" + "="*80)
 print("✅ FIXED DATA MERGING COMPLETE!")
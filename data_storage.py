@@ -0,0 +1,454 @@
+"""
+SQLite Data Storage Script
+==========================
+Exports the merged master databases into a local SQLite file so later
+services can query them with indexes instead of loading whole CSVs into pandas.
+
+What this script does:
+- Creates normalized tables: colleges, courses and rankings
+- Adds indexes on state, course, fee and NIRF rank
+- Bulk-loads the master CSVs with executemany inside one transaction
+- Provides a small connection-pooled, read-only query API
+- Benchmarks indexed SQLite queries against the equivalent pandas filters
+
+Usage:
+    python data_storage.py             # build data/colleges.db and benchmark
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+from data_loading import load_stage
+from entity_resolution import make_college_id
+import warnings
+warnings.filterwarnings('ignore')
+
+DB_PATH = 'data/colleges.db'
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS colleges (
+    college_id         INTEGER PRIMARY KEY,
+    college_key        TEXT,
+    row_key            TEXT,
+    college_name       TEXT NOT NULL,
+    city               TEXT,
+    state              TEXT,
+    university         TEXT,
+    college_type       TEXT,
+    institute_type     TEXT,
+    established_year   INTEGER,
+    rating             REAL,
+    average_fees       REAL,
+    nba_accreditation  TEXT,
+    naac_accreditation TEXT,
+    website            TEXT,
+    data_sources       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS courses (
+    course_entry_id INTEGER PRIMARY KEY,
+    college_id      INTEGER NOT NULL REFERENCES colleges(college_id),
+    course          TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS rankings (
+    college_id INTEGER PRIMARY KEY REFERENCES colleges(college_id),
+    nirf_rank  INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_colleges_key ON colleges(college_key);
+CREATE INDEX IF NOT EXISTS idx_colleges_row_key ON colleges(row_key);
+CREATE INDEX IF NOT EXISTS idx_colleges_state ON colleges(state);
+CREATE INDEX IF NOT EXISTS idx_colleges_fees ON colleges(average_fees);
+CREATE INDEX IF NOT EXISTS idx_colleges_state_fees ON colleges(state, average_fees);
+CREATE INDEX IF NOT EXISTS idx_courses_course ON courses(course COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_courses_college ON courses(college_id);
+CREATE INDEX IF NOT EXISTS idx_rankings_rank ON rankings(nirf_rank);
+"""
+
+# Master CSV column -> colleges table column
+COLLEGE_COLUMNS = {
+    'Cluster_ID': 'college_key',
+    'College_ID': 'row_key',
+    'College Name': 'college_name',
+    'City': 'city',
+    'State': 'state',
+    'University': 'university',
+    'College Type': 'college_type',
+    'Institute_Type': 'institute_type',
+    'Established Year': 'established_year',
+    'Rating': 'rating',
+    'Average Fees': 'average_fees',
+    'NBA_Accreditation': 'nba_accreditation',
+    'NAAC_Accreditation': 'naac_accreditation',
+    'Website': 'website',
+    'Data_Sources': 'data_sources',
+}
+
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def to_sql_value(value):
+    """
+    Converts pandas/numpy values into plain Python values for sqlite3
+    (NaN becomes NULL, numpy scalars become int/float)
+    """
+    if pd.isna(value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def location_key(name, city, state):
+    """
+    Builds the (name, city, state) key used to link course rows to colleges
+    when the master files predate College_ID/Cluster_ID
+    """
+    return (str(name).strip().lower(), str(city).strip().lower(), str(state).strip().lower())
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def create_schema(conn):
+    """
+    Creates all tables and indexes (safe to call on an existing database).
+    Statements run one by one so they join any open transaction.
+    """
+    for statement in SCHEMA.split(';'):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def drop_schema(conn):
+    """
+    Drops all tables (and their indexes) so the schema can be rebuilt
+    """
+    for table in ('courses', 'rankings', 'colleges'):
+        conn.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def export_to_sqlite(master_colleges, master_courses, db_path=DB_PATH):
+    """
+    Writes the master dataframes into SQLite.
+    Existing tables are dropped and rebuilt with the current schema; the
+    rebuild and all inserts run in a single transaction.
+    college_key holds the Cluster_ID (one per college cluster) and row_key
+    the per-row College_ID. Course rows are linked by Cluster_ID, falling
+    back to College_ID and then to (name, city, state) for older files.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        college_rows = []
+        ranking_rows = []
+        cluster_ids = {}
+        row_ids = {}
+        location_ids = {}
+        for college_id, record in enumerate(master_colleges.to_dict('records'), start=1):
+            # Older master files lack College_ID/Cluster_ID - use the same
+            # per-row ID data_merging.py would assign (each row its own
+            # cluster), so neither key is ever NULL
+            if pd.isna(record.get('College_ID')):
+                record['College_ID'] = make_college_id(
+                    record['College Name'], record['City'], record['State'])
+            if pd.isna(record.get('Cluster_ID')):
+                record['Cluster_ID'] = record['College_ID']
+            values = [to_sql_value(record.get(col)) for col in COLLEGE_COLUMNS]
+            college_rows.append([college_id] + values)
+
+            cluster_ids.setdefault(record['Cluster_ID'], college_id)
+            row_ids.setdefault(record['College_ID'], college_id)
+            location_ids.setdefault(
+                location_key(record['College Name'], record['City'], record['State']),
+                college_id
+            )
+            if pd.notna(record.get('NIRF_Rank')):
+                ranking_rows.append((college_id, int(record['NIRF_Rank'])))
+
+        course_rows = []
+        skipped_courses = 0
+        for record in master_courses.itertuples(index=False):
+            if pd.notna(getattr(record, 'Cluster_ID', None)):
+                college_id = cluster_ids.get(record.Cluster_ID)
+            elif pd.notna(getattr(record, 'College_ID', None)):
+                college_id = row_ids.get(record.College_ID)
+            else:
+                college_id = location_ids.get(
+                    location_key(record.College_Name, record.City, record.State))
+            if college_id is None:
+                skipped_courses += 1
+                continue
+            course_rows.append((college_id, str(record.Course)))
+
+        placeholders = ', '.join(['?'] * (len(COLLEGE_COLUMNS) + 1))
+        columns = ', '.join(['college_id'] + list(COLLEGE_COLUMNS.values()))
+
+        conn.execute('BEGIN')
+        try:
+            drop_schema(conn)
+            create_schema(conn)
+            conn.executemany(
+                f'INSERT INTO colleges ({columns}) VALUES ({placeholders})',
+                college_rows
+            )
+            conn.executemany(
+                'INSERT INTO rankings (college_id, nirf_rank) VALUES (?, ?)',
+                ranking_rows
+            )
+            conn.executemany(
+                'INSERT INTO courses (college_id, course) VALUES (?, ?)',
+                course_rows
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+
+    return {
+        'colleges': len(college_rows),
+        'rankings': len(ranking_rows),
+        'courses': len(course_rows),
+        'skipped_courses': skipped_courses,
+    }
+
+
+# ============================================================================
+# CONNECTION-POOLED READ API
+# ============================================================================
+
+class ConnectionPool:
+    """
+    Fixed-size pool of read-only SQLite connections.
+    Connections are opened lazily and reused across queries/threads.
+    close() closes idle connections now and borrowed ones when they are returned.
+    """
+
+    def __init__(self, db_path=DB_PATH, size=4):
+        self.db_path = db_path
+        self.size = size
+        self._pool = queue.Queue(maxsize=size)
+        self._connections = set()
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # as_uri() percent-escapes characters like ?, # and % in the path
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection from the pool and returns it afterwards
+        """
+        conn = None
+        while conn is None:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if len(self._connections) < self.size:
+                        conn = self._open()
+                        self._connections.add(conn)
+                if conn is None:
+                    # Pool exhausted - wait briefly, then re-check capacity
+                    # (close() may have retired the borrowed connections)
+                    try:
+                        conn = self._pool.get(timeout=0.05)
+                    except queue.Empty:
+                        pass
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                # Connections retired by close() while borrowed are closed here
+                if conn in self._connections:
+                    self._pool.put_nowait(conn)
+                else:
+                    conn.close()
+
+    def query(self, sql, params=()):
+        """
+        Runs a read query and returns the rows as a list of dicts
+        """
+        with self.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def close(self):
+        with self._lock:
+            while not self._pool.empty():
+                self._pool.get_nowait().close()
+            self._connections.clear()
+
+
+def find_colleges(pool, state=None, max_fees=None, limit=50):
+    """
+    Colleges filtered by state and/or maximum average fees, cheapest first
+    """
+    clauses = []
+    params = []
+    if state:
+        clauses.append('state = ?')
+        params.append(state)
+    if max_fees is not None:
+        clauses.append('average_fees > 0 AND average_fees <= ?')
+        params.append(max_fees)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    sql = f"""
+        SELECT college_id, college_name, city, state, average_fees, rating
+        FROM colleges {where}
+        ORDER BY average_fees
+        LIMIT ?
+    """
+    return pool.query(sql, params + [limit])
+
+
+def find_colleges_by_course(pool, course, state=None):
+    """
+    Colleges offering an exact course name (case-insensitive), optionally in one state
+    """
+    sql = """
+        SELECT DISTINCT c.college_id, c.college_name, c.city, c.state, c.average_fees
+        FROM courses co
+        JOIN colleges c ON c.college_id = co.college_id
+        WHERE co.course = ? COLLATE NOCASE
+    """
+    params = [course]
+    if state:
+        sql += ' AND c.state = ?'
+        params.append(state)
+    return pool.query(sql, params)
+
+
+def top_ranked(pool, n=10):
+    """
+    Top N NIRF ranked colleges
+    """
+    sql = """
+        SELECT r.nirf_rank, c.college_id, c.college_name, c.city, c.state
+        FROM rankings r
+        JOIN colleges c ON c.college_id = r.college_id
+        ORDER BY r.nirf_rank
+        LIMIT ?
+    """
+    return pool.query(sql, [n])
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def time_call(func, repeat=50):
+    """
+    Returns the median wall time of func() in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def benchmark_queries(master_colleges, master_courses, pool, state='Tamil Nadu',
+                      max_fees=100000, course='COMPUTER SCIENCE AND ENGINEERING'):
+    """
+    Compares query latency of indexed SQLite against the in-pandas filters
+    """
+    benchmarks = {
+        'state + fee filter': (
+            lambda: master_colleges[
+                (master_colleges['State'] == state)
+                & (master_colleges['Average Fees'] > 0)
+                & (master_colleges['Average Fees'] <= max_fees)
+            ].nsmallest(50, 'Average Fees'),
+            lambda: find_colleges(pool, state=state, max_fees=max_fees),
+        ),
+        'course + state': (
+            lambda: master_courses[
+                (master_courses['Course'].str.lower() == course.lower())
+                & (master_courses['State'] == state)
+            ].drop_duplicates(['College_Name', 'City', 'State']),
+            lambda: find_colleges_by_course(pool, course, state=state),
+        ),
+        'top 10 NIRF': (
+            lambda: master_colleges[master_colleges['NIRF_Rank'].notna()].nsmallest(10, 'NIRF_Rank'),
+            lambda: top_ranked(pool, 10),
+        ),
+    }
+
+    results = []
+    for name, (pandas_query, sqlite_query) in benchmarks.items():
+        pandas_ms = time_call(pandas_query)
+        sqlite_ms = time_call(sqlite_query)
+        results.append((name, pandas_ms, sqlite_ms))
+        speedup = pandas_ms / sqlite_ms if sqlite_ms > 0 else float('inf')
+        print(f"   {name:<20} pandas {pandas_ms:8.3f} ms | sqlite {sqlite_ms:8.3f} ms | {speedup:6.1f}x")
+
+    return results
+
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+def main():
+    """
+    Builds the SQLite database from the master CSVs and runs the benchmark
+    """
+    print("\n" + "="*80)
+    print("SQLITE EXPORT")
+    print("="*80)
+
+    try:
+        master_colleges = load_stage('storage_colleges')
+        master_courses = load_stage('storage_courses')
+        print(f"✓ Loaded {len(master_colleges):,} colleges and {len(master_courses):,} course entries")
+
+        counts = export_to_sqlite(master_colleges, master_courses)
+        print(f"\n✓ SAVED: {DB_PATH}")
+        print(f"   - colleges: {counts['colleges']:,}")
+        print(f"   - rankings: {counts['rankings']:,}")
+        print(f"   - courses: {counts['courses']:,}")
+        if counts['skipped_courses']:
+            print(f"   ⚠ {counts['skipped_courses']} course rows had no matching college")
+
+        print("\n" + "="*80)
+        print("QUERY BENCHMARK (median of 50 runs)")
+        print("="*80 + "\n")
+        pool = ConnectionPool(DB_PATH)
+        try:
+            benchmark_queries(master_colleges, master_courses, pool)
+        finally:
+            pool.close()
+
+        print("\n✅ SQLite export complete!")
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
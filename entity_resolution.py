@@ -0,0 +1,122 @@
+"""
+College Entity Resolution
+=========================
+Assigns a stable College_ID to every college so that multi-campus names
+like "College of Engineering" (x22) are kept apart and merges can key on an
+ID instead of the college name string.
+
+How it works:
+1. Each row's College_ID is hashed from its own normalized (name, city, state),
+   so it never depends on which other rows exist - adding or removing a name
+   variant doesn't change anyone else's ID
+2. Blocking - rows are only compared within the same (state, city) block
+3. Pairwise scoring - names in a block are compared with token_sort_ratio
+4. Union-find - pairs scoring >= threshold are unioned into one cluster, and
+   an alias map points every College_ID to its cluster's representative ID.
+   data_merging.py stores that representative as Cluster_ID, which links
+   courses, SQLite rows and the course index; College_ID stays the
+   per-row key.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def normalize_key(value):
+    """
+    Lowercases and strips punctuation/extra spaces for blocking and hashing
+    """
+    if pd.isna(value):
+        return ''
+    value = re.sub(r'[^a-z0-9 ]', ' ', str(value).lower())
+    return re.sub(r'\s+', ' ', value).strip()
+
+
+def make_college_id(name, city, state):
+    """
+    Stable ID for a college, derived from its normalized (name, city, state)
+    """
+    key = '|'.join([normalize_key(name), normalize_key(city), normalize_key(state)])
+    return 'CLG-' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]
+
+
+class UnionFind:
+    """
+    Disjoint-set forest with path compression and union by size
+    """
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
+# ============================================================================
+# ENTITY RESOLUTION
+# ============================================================================
+
+def resolve_college_ids(df, name_col='College Name', city_col='City',
+                        state_col='State', threshold=95):
+    """
+    Returns (College_ID Series aligned with df.index, alias map).
+    College_ID depends only on the row's own (name, city, state). The alias
+    map sends every College_ID to the representative (smallest) College_ID of
+    its cluster: rows in the same (state, city) block whose names score
+    >= threshold are the same college.
+    """
+    names = [normalize_key(name) for name in df[name_col]]
+    cities = [normalize_key(city) for city in df[city_col]]
+    states = [normalize_key(state) for state in df[state_col]]
+
+    # 1. Stable per-row IDs (rows with identical normalized keys share one)
+    college_ids = [make_college_id(name, city, state)
+                   for name, city, state in zip(names, cities, states)]
+
+    # 2. Blocking - one entry per distinct ID is enough to score
+    id_position = {}
+    blocks = defaultdict(list)
+    for pos, college_id in enumerate(college_ids):
+        if college_id not in id_position:
+            id_position[college_id] = pos
+            blocks[(states[pos], cities[pos])].append(pos)
+
+    # 3 + 4. Pairwise scoring and union-find
+    clusters = UnionFind(len(df))
+    for members in blocks.values():
+        for i, pos_a in enumerate(members):
+            for pos_b in members[i + 1:]:
+                if fuzz.token_sort_ratio(names[pos_a], names[pos_b]) >= threshold:
+                    clusters.union(pos_a, pos_b)
+
+    representative = {}
+    for college_id, pos in id_position.items():
+        root = clusters.find(pos)
+        if root not in representative or college_id < representative[root]:
+            representative[root] = college_id
+
+    aliases = {college_id: representative[clusters.find(pos)]
+               for college_id, pos in id_position.items()}
+    return pd.Series(college_ids, index=df.index, name='College_ID'), aliases
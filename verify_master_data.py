@@ -4,26 +4,29 @@ Final Verification - Quick Check
 Run this anytime to verify the master databases are correct
 """
 
-import pandas as pd
+from data_loading import load_stage, read_header
 
 print("\n" + "="*80)
 print("✅ FINAL VERIFICATION - MASTER DATABASES")
 print("="*80)
 
 # Load master databases
-master_colleges = pd.read_csv('data/master_colleges.csv')
-master_courses = pd.read_csv('data/master_courses.csv')
+# Only the columns checked below are read (see data_loading.STAGES)
+master_colleges = load_stage('verify_colleges')
+master_courses = load_stage('verify_courses')
 
 print(f"\n📊 MASTER COLLEGES:")
 print(f"   - Total colleges: {len(master_colleges):,}")
-print(f"   - Columns: {len(master_colleges.columns)}")
+print(f"   - Columns: {len(read_header('data/master_colleges.csv'))}")
 print(f"   - NIRF ranked: {master_colleges['NIRF_Rank'].notna().sum()}")
 print(f"   - NBA accredited: {(master_colleges['NBA_Accreditation'] != 'Not Available').sum()}")
 print(f"   - NAAC accredited: {(master_colleges['NAAC_Accreditation'] != 'Not Available').sum()}")
 
 print(f"\n📊 MASTER COURSES:")
 print(f"   - Total course entries: {len(master_courses):,}")
-print(f"   - Unique colleges: {master_courses['College_Name'].nunique()}")
+college_key = next(col for col in ['Cluster_ID', 'College_ID', 'College_Name']
+                   if col in master_courses.columns)
+print(f"   - Unique colleges: {master_courses[college_key].nunique()}")
 print(f"   - Unique courses: {master_courses['Course'].nunique()}")
 
 print(f"\n🏆 TOP 10 NIRF RANKED COLLEGES:")